@@ -1,51 +1,154 @@
-import csv, io, os, base64, html
+import bisect, csv, operator, os
+from html import escape as _escape
 import streamlit as st
 
 # ----------------------------
-# 배경: bg.jpg를 Base64로 CSS 주입 (경로 문제 무력화)
+# 이미지 캐시
 # ----------------------------
-def inject_background(base_dir: str, filename: str = "bg.jpg"):
+# 문제/결과/플레이스홀더 이미지 수보다 넉넉하게 잡되, 파일이 바뀔 때마다 사본이 쌓이지 않도록 제한합니다.
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _img_bytes(path: str, mtime: float) -> bytes:
     """
-    주어진 디렉터리에서 배경 이미지 파일을 읽어
-    Base64로 인코딩한 뒤 Streamlit 앱의 배경으로 설정합니다.
+    이미지 파일의 내용을 읽어 반환합니다. (세션/사용자 간 공유 캐시)
 
     Args:
-        base_dir (str): 이미지 파일이 위치한 기본 디렉터리
-        filename (str): 배경 이미지 파일명 (기본값: 'bg.jpg')
+        path (str): 이미지 파일 경로
+        mtime (float): 파일 수정 시각 (파일이 바뀌면 캐시를 무효화하기 위한 키)
+
+    Returns:
+        bytes: 이미지 파일 데이터
     """
-    path = os.path.join(base_dir, filename)
-    if not os.path.exists(path):
-        # 배경 이미지를 찾을 수 없으면 아무 것도 하지 않습니다.
-        return
-    # 이미지 파일을 읽어 Base64로 인코딩합니다.
     with open(path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("ascii")
-    # CSS를 통해 앱의 배경에 이미지를 적용합니다.
-    # Streamlit 버전에 따라 내부 CSS 구조가 변할 수 있으므로, 최상위 .stApp 클래스에 배경 이미지를 지정합니다.
-    # 반복 패턴이 있는 배경 이미지는 repeat 옵션을 사용하여 화면 전체에 자연스럽게 채웁니다.
-    st.markdown(
-        f"""
+        return f.read()
+
+def _load_image(base_dir: str, name: str):
+    """
+    캐시된 이미지 데이터를 반환합니다.
+
+    Args:
+        base_dir (str): 이미지 파일이 위치한 기본 디렉터리
+        name (str): 파일명 또는 기본 디렉터리 기준 상대 경로
+
+    Returns:
+        bytes | None: 이미지 파일 데이터. 파일이 없거나 읽을 수 없으면 None
+    """
+    path = os.path.join(base_dir, name)
+    # 존재 확인과 캐시 키 계산을 getmtime 한 번으로 처리합니다.
+    try:
+        return _img_bytes(path, os.path.getmtime(path))
+    except OSError:
+        return None
+
+# ----------------------------
+# 배경: bg.jpg를 Base64로 CSS 주입 (경로 문제 무력화)
+# ----------------------------
+# Streamlit 버전에 따라 내부 CSS 구조가 변할 수 있으므로, 최상위 .stApp 클래스에 배경 이미지를 지정합니다.
+# 반복 패턴이 있는 배경 이미지는 repeat 옵션을 사용하여 화면 전체에 자연스럽게 채웁니다.
+# Base64 데이터 앞뒤의 CSS 조각 (join으로 한 번에 조립합니다)
+_BG_CSS_HEAD = """
         <style>
         /* 전체 앱 배경 지정 */
-        .stApp {{
-            background-image: url("data:image/jpg;base64,{b64}");
+        .stApp {
+            background-image: url("data:image/jpg;base64,"""
+_BG_CSS_TAIL = """");
             background-repeat: repeat;
             background-position: center;
             background-size: contain;
            
-        }}
+        }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+def _bg_b64(path: str) -> str:
+    """
+    배경 이미지 파일을 읽어 Base64 문자열로 인코딩합니다.
+    최종 스타일 문자열만 _styles_html에서 캐시하므로 여기서는 캐시하지 않습니다.
+
+    Args:
+        path (str): 이미지 파일 경로
+
+    Returns:
+        str: Base64로 인코딩된 이미지 데이터
+    """
+    import base64  # 배경 주입에만 필요하므로 지연 임포트합니다.
+
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("ascii")
 
 # ----------------------------
 # CSV 로더 (pandas 미사용, BOM/빈줄 방어)
 # ----------------------------
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_questions_cached(csv_path: str, mtime: float):
+    """
+    CSV 파일을 파싱하여 문항 리스트를 반환합니다. (UI 호출 없음, 캐시 대상)
+
+    Args:
+        csv_path (str): CSV 파일의 절대 경로
+        mtime (float): 파일 수정 시각 (파일이 바뀌면 캐시를 무효화하기 위한 키)
+
+    Returns:
+        list[dict]: 정렬된 문항 리스트. 데이터가 없으면 빈 리스트
+    """
+    # utf-8-sig 코덱이 BOM을 처리하고, 파일을 한 줄씩 스트리밍으로 읽습니다.
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        # 헤더 앞의 빈 줄은 건너뜁니다.
+        header = next((r for r in reader if any(c.strip() for c in r)), None)
+        if header is None:
+            return []
+
+        # 컬럼 위치를 한 번만 계산합니다. (없는 컬럼은 None)
+        idx = {name.strip(): i for i, name in enumerate(header)}
+        i_id, i_q, i_type, i_img, i_c1, i_c2, i_c3, i_ans = (
+            idx.get(name)
+            for name in ("id", "question", "type", "image", "choice1", "choice2", "choice3", "answer")
+        )
+
+        def cell(row, i):
+            # 없는 컬럼이나 짧은 행의 빈 칸은 빈 문자열로 읽습니다.
+            return row[i].strip() if i is not None and i < len(row) else ""
+
+        items = []
+        for row in reader:
+            # 빈 줄을 건너뜁니다.
+            if not any(c.strip() for c in row):
+                continue
+            qtype = cell(row, i_type)
+            choices = [cell(row, i_c1), cell(row, i_c2), cell(row, i_c3)]
+            answer = cell(row, i_ans)
+            question = cell(row, i_q)
+            id_str = cell(row, i_id)
+            # 정렬용 정수 id를 한 번만 계산합니다. (숫자가 아니면 맨 뒤로)
+            try:
+                id_int = int(id_str)
+            except ValueError:
+                id_int = 10 ** 9
+            items.append({
+                "id": id_str,
+                "id_int": id_int,
+                "question": question,
+                # 질문 배너 HTML (질문이 비어 있으면 화면에서 '문제 N'으로 대체)
+                "banner_html": f'<div class="question-banner">{_escape(question)}</div>' if question else "",
+                "type": qtype,
+                "image": cell(row, i_img),
+                "choices": choices,
+                "choices_nonempty": [c for c in choices if c],
+                "is_mcq": qtype == "객관식",
+                "answer": answer,
+                # 채점용 비교값: 주관식은 대소문자를 구분하지 않으므로 미리 소문자로 바꿔 둡니다.
+                "answer_cmp": answer.lower() if qtype == "주관식" else answer,
+            })
+
+    # id 순으로 정렬합니다.
+    items.sort(key=operator.itemgetter("id_int"))
+    return items
+
 def load_questions(csv_path: str):
     """
     CSV 파일에서 퀴즈 문항을 로드합니다. pandas를 사용하지 않고
     Python 내장 csv 모듈을 이용하여 BOM과 빈줄을 방지합니다.
+    파싱 결과는 캐시되어 재실행(rerun)마다 CSV를 다시 읽지 않습니다.
 
     Args:
         csv_path (str): CSV 파일의 경로
@@ -53,74 +156,92 @@ def load_questions(csv_path: str):
     Returns:
         list[dict]: 정렬된 문항 리스트
     """
-    if not os.path.exists(csv_path):
+    csv_path = os.path.abspath(csv_path)
+    # 존재 확인은 캐시 밖에서 하여 '파일 없음' 결과가 캐시되지 않도록 합니다.
+    try:
+        items = _load_questions_cached(csv_path, os.path.getmtime(csv_path))
+    except OSError:
         st.error(f"CSV 파일을 찾을 수 없습니다: {csv_path}")
         st.stop()
-
-    with open(csv_path, "r", encoding="utf-8-sig") as f:
-        raw = f.read().splitlines()
-    # 빈 줄을 제거합니다.
-    lines = [ln for ln in raw if ln.strip() != ""]
-    if not lines:
+    if not items:
         st.error("CSV에 데이터가 없습니다.")
         st.stop()
-
-    buf = io.StringIO("\n".join(lines))
-    dr = csv.DictReader(buf)
-
-    # 헤더의 BOM 제거
-    clean_names = [(fn or "").lstrip("\ufeff") for fn in (dr.fieldnames or [])]
-    field_map = {clean: orig for clean, orig in zip(clean_names, dr.fieldnames)}
-
-    def get(row, key, default=""):
-        real = field_map.get(key, key)
-        return (row.get(real, default) or "").strip()
-
-    items = []
-    for r in dr:
-        items.append({
-            "id": get(r, "id"),
-            "question": get(r, "question"),
-            "type": get(r, "type"),
-            "image": get(r, "image"),
-            "choices": [get(r, "choice1"), get(r, "choice2"), get(r, "choice3")],
-            "answer": get(r, "answer"),
-        })
-
-    def safe_int(x):
-        try:
-            return int(x)
-        except:
-            return 10 ** 9
-    # id 순으로 정렬합니다.
-    items.sort(key=lambda q: safe_int(q["id"]))
     return items
 
 # ----------------------------
 # 채점
 # ----------------------------
-def judge(user_answer: str, correct_answer: str, qtype: str) -> bool:
+def judge(user_answer: str, q: dict) -> bool:
     """
     사용자 답안과 정답을 비교하여 맞았는지 여부를 반환합니다.
 
     Args:
         user_answer (str): 사용자가 입력한 답안
-        correct_answer (str): 실제 정답
-        qtype (str): 문제 유형 ('주관식' 또는 '객관식')
+        q (dict): load_questions가 반환한 문항 (미리 계산된 'answer_cmp' 사용)
 
     Returns:
         bool: 정답 여부
     """
     ua = (user_answer or "").strip()
-    ca = (correct_answer or "").strip()
-    if qtype == "주관식":
+    if q["type"] == "주관식":
         # 대소문자를 구분하지 않습니다.
-        return ua.lower() == ca.lower()
-    return ua == ca
+        ua = ua.lower()
+    return ua == q["answer_cmp"]
+
+def _grade(questions, answers):
+    """
+    전체 문항을 채점합니다.
+
+    Args:
+        questions (list[dict]): 정렬된 문항 리스트
+        answers (dict[int, str]): {문항 위치(0부터): 사용자 답안}
+
+    Returns:
+        tuple[int, list[dict]]: (맞은 문제 수, 결과 표 행 목록)
+    """
+    correct = 0
+    rows = []
+    for pos, q in enumerate(questions):
+        my = answers.get(pos, "")
+        ok = judge(my, q)
+        if ok:
+            correct += 1
+        rows.append({
+            "문항": q["id"], "문제": q.get("question", ""),
+            "내 답": my, "정답": q.get("answer", ""), "정오": "O" if ok else "X",
+        })
+    return correct, rows
+
+def _rows_html(rows):
+    """
+    채점 결과 행 목록을 HTML 표 문자열로 변환합니다.
+
+    Args:
+        rows (list[dict]): _grade가 반환한 결과 표 행 목록
+
+    Returns:
+        str: <table> HTML 문자열
+    """
+    cols = ("문항", "문제", "내 답", "정답", "정오")
+    head = "".join(f"<th>{c}</th>" for c in cols)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{_escape(str(r[c]))}</td>" for c in cols) + "</tr>"
+        for r in rows
+    )
+    return f'<table class="result-table"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
 
 # ----------------------------
 # 결과 티어
 # ----------------------------
+# (점수 상한, 이미지 파일명, 메시지) — 상한 오름차순
+_TIERS = [
+    (5, "result1.png", "오.. 아직 MZ 감성 입문! 다음엔 더 잘하실 수 있어요 😉"),
+    (10, "result2.png", "좋아요! 감이 오기 시작했어요 😎"),
+    (15, "result3.png", "우와! 꽤나 MZ 트렌디하신데요? 🔥"),
+    (10 ** 9, "result4.png", "완벽! 당신은 거의 MZ 그 자체 🙌"),
+]
+_TIER_BOUNDS = [t[0] for t in _TIERS]
+
 def result_tier(score: int):
     """
     점수에 따라 표시할 결과 이미지와 메시지를 결정합니다.
@@ -131,23 +252,13 @@ def result_tier(score: int):
     Returns:
         tuple[str, str]: (이미지 파일명, 메시지)
     """
-    if score <= 5:
-        return "result1.png", "오.. 아직 MZ 감성 입문! 다음엔 더 잘하실 수 있어요 😉"
-    if 6 <= score <= 10:
-        return "result2.png", "좋아요! 감이 오기 시작했어요 😎"
-    if 11 <= score <= 15:
-        return "result3.png", "우와! 꽤나 MZ 트렌디하신데요? 🔥"
-    return "result4.png", "완벽! 당신은 거의 MZ 그 자체 🙌"
+    _, img, msg = _TIERS[bisect.bisect_left(_TIER_BOUNDS, score)]
+    return img, msg
 
 # ----------------------------
 # 공통 스타일
 # ----------------------------
-def inject_css():
-    """
-    앱 전반에 적용할 CSS 스타일을 주입합니다.
-    """
-    st.markdown(
-        """
+_CSS_BLOCK = """
         <style>
         h1, [data-testid="stHeader"] h1, .st-emotion-cache-10trblm {
             text-align: center !important; font-weight: 800 !important;
@@ -175,10 +286,68 @@ def inject_css():
             max-width:650px !important; width:650px !important; height:auto !important;
             display:block; margin:0 auto; border-radius:10px; box-shadow:0 4px 16px rgba(0,0,0,.08);
         }
+        .result-table {
+            width:100%; border-collapse:separate; border-spacing:0; background:#fff; overflow:hidden;
+            border:1px solid #e8e9f1; border-radius:12px; font-size:14px;
+        }
+        .result-table th, .result-table td { padding:8px 10px; border-bottom:1px solid #e8e9f1; text-align:left; }
+        .result-table th { background:#f6f4ff; font-weight:700; }
+        .result-table tbody tr:last-child td { border-bottom:none; }
         </style>
-        """,
-        unsafe_allow_html=True,
+        """
+
+@st.cache_data(show_spinner=False)
+def _nav_html(total: int, active: int) -> str:
+    """
+    상단 네비게이션 칩 행 HTML을 생성합니다. (캐시 대상)
+
+    Args:
+        total (int): 전체 문항 수
+        active (int): 현재 문항 번호 (1부터 시작)
+
+    Returns:
+        str: 칩 목록을 감싼 네비게이션 <div> HTML
+    """
+    chips = "".join(
+        f'<span class="chip active">{n}</span>' if n == active else f'<span class="chip">{n}</span>'
+        for n in range(1, total + 1)
     )
+    return f'<div class="top-nav">{chips}</div>'
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _styles_html(bg_path: str, mtime: float) -> str:
+    """
+    배경 CSS와 공통 CSS를 합친 스타일 HTML을 생성합니다.
+    변경되지 않는 문자열이므로 cache_resource로 복사 없이 같은 객체를 재사용합니다.
+
+    Args:
+        bg_path (str): 배경 이미지 경로 (없으면 빈 문자열)
+        mtime (float): 배경 이미지 수정 시각 (파일이 바뀌면 캐시를 무효화하기 위한 키)
+
+    Returns:
+        str: <style> 블록들을 이어 붙인 HTML
+    """
+    if not bg_path:
+        return _CSS_BLOCK
+    # 큰 문자열은 한 번의 join으로 만들어 중간 복사본을 줄입니다.
+    return "".join((_BG_CSS_HEAD, _bg_b64(bg_path), _BG_CSS_TAIL, _CSS_BLOCK))
+
+def inject_styles(base_dir: str, bg_filename: str = "bg.jpg"):
+    """
+    배경 이미지(Base64)와 앱 전반의 CSS 스타일을 한 번의 st.markdown 호출로 주입합니다.
+    배경 이미지를 찾을 수 없으면 공통 CSS만 주입합니다.
+
+    Args:
+        base_dir (str): 이미지 파일이 위치한 기본 디렉터리
+        bg_filename (str): 배경 이미지 파일명 (기본값: 'bg.jpg')
+    """
+    bg_path = os.path.join(base_dir, bg_filename)
+    try:
+        styles = _styles_html(bg_path, os.path.getmtime(bg_path))
+    except OSError:
+        # 배경 이미지가 없거나 읽을 수 없으면 공통 CSS만 사용합니다.
+        styles = _styles_html("", 0.0)
+    st.markdown(styles, unsafe_allow_html=True)
 
 # ----------------------------
 # 메인
@@ -191,10 +360,8 @@ def main():
 
     # 현재 파일의 디렉터리
     base_dir = os.path.dirname(__file__)
-    # 배경 이미지 주입
-    inject_background(base_dir)     # bg.jpg → Base64 주입
-    # 공통 CSS 스타일 주입
-    inject_css()
+    # 배경 이미지(bg.jpg → Base64)와 공통 CSS 스타일 주입
+    inject_styles(base_dir)
 
     # 퀴즈 문제 로드
     questions = load_questions(os.path.join(base_dir, "mz_test.csv"))
@@ -204,7 +371,7 @@ def main():
     if "page" not in ss:
         ss.page = 0         # 0: 시작, 1..N: 문제, N+1: 결과
     if "answers" not in ss:
-        ss.answers = {}  # {id: answer}
+        ss.answers = {}  # {문항 위치(0부터): answer}
     if "username" not in ss:
         ss.username = ""
 
@@ -212,8 +379,11 @@ def main():
     if ss.page == 0:
         st.title("MZ 테스트")
         st.write("MZ 신조어/밈 이해도를 확인해보세요. 이름을 입력하면 결과에 표시됩니다.")
-        ss.username = st.text_input("이름을 입력하세요", value=ss.username)
-        if st.button("시작하기"):
+        # 폼으로 묶어 입력 중에는 재실행되지 않고 '시작하기'를 누를 때만 반영되도록 합니다.
+        with st.form(key="form_start"):
+            ss.username = st.text_input("이름을 입력하세요", value=ss.username)
+            started = st.form_submit_button("시작하기")
+        if started:
             ss.page = 1
             st.rerun()
         return
@@ -224,88 +394,77 @@ def main():
         disp_no = ss.page
 
         # 네비게이션
-        chips = []
-        for n in range(1, total + 1):
-            cls = "chip active" if n == disp_no else "chip"
-            chips.append(f'<span class="{cls}">{n}</span>')
-        st.markdown(f'<div class="top-nav">{"".join(chips)}</div>', unsafe_allow_html=True)
+        st.markdown(_nav_html(total, disp_no), unsafe_allow_html=True)
 
         # 질문 배너
-        question_text = (q.get("question") or "").strip()
         st.markdown(
-            f'<div class="question-banner">{html.escape(question_text) if question_text else f"문제 {disp_no}"}</div>',
+            q["banner_html"] or f'<div class="question-banner">문제 {disp_no}</div>',
             unsafe_allow_html=True,
         )
 
         # 문제 이미지 (경고 없이 width만 사용)
-        img_file = (q.get("image") or "").strip()
+        img_file = q["image"]
         if img_file:
-            img_path = os.path.join(base_dir, img_file)
-            if os.path.exists(img_path):
-                st.image(img_path, width=650)  # ← use_column_width 사용 안 함
+            img = _load_image(base_dir, img_file)
+            if img is not None:
+                st.image(img, width=650)  # ← use_column_width 사용 안 함
             else:
-                ph = os.path.join(base_dir, "placeholder_light_gray_block.png")
-                if os.path.exists(ph):
+                ph = _load_image(base_dir, "placeholder_light_gray_block.png")
+                if ph is not None:
                     st.image(ph, caption="이미지를 찾을 수 없습니다.", width=650)
 
         # 입력 폼
         with st.form(key=f"form_q_{q['id']}"):
-            if (q.get("type") or "").strip() == "객관식":
-                choices = [c for c in (q.get("choices") or []) if c]
-                answer = st.radio("정답을 선택하세요:", options=choices, index=None)
+            if q["is_mcq"]:
+                answer = st.radio("정답을 선택하세요:", options=q["choices_nonempty"], index=None)
             else:
                 answer = st.text_input("정답을 입력하세요:", value="")
             submitted = st.form_submit_button("다음")
 
         if submitted:
             # 객관식 문제에서 답이 선택되지 않았을 때 경고를 표시합니다.
-            if (q.get("type") or "").strip() == "객관식" and not answer:
+            if q["is_mcq"] and not answer:
                 st.warning("보기를 선택해 주세요.")
                 st.stop()
             # 주관식 문제에서 입력이 비어 있을 때 경고를 표시합니다.
             is_blank_subjective = (
-                (q.get("type") or "").strip() == "주관식"
+                q["type"] == "주관식"
                 and (answer or "").strip() == ""
             )
             if is_blank_subjective:
                 st.warning("정답을 입력해 주세요.")
                 st.stop()
             # 답을 기록하고 다음 문제로 넘어갑니다.
-            ss.answers[str(q["id"])] = (answer or "").strip()
+            # id는 중복/비숫자일 수 있으므로 문항 위치를 키로 사용합니다.
+            ss.answers[ss.page - 1] = (answer or "").strip()
             ss.page += 1
             st.rerun()
         return
 
     # 결과 페이지
     if ss.page > total:
-        correct = 0
-        rows = []
-        for q in questions:
-            qid = str(q["id"])
-            my = ss.answers.get(qid, "")
-            ok = judge(my, q.get("answer", ""), q.get("type", ""))
-            if ok:
-                correct += 1
-            rows.append({
-                "문항": int(qid), "문제": q.get("question", ""),
-                "내 답": my, "정답": q.get("answer", ""), "정오": "O" if ok else "X",
-            })
+        # 채점 결과는 답안이 바뀌지 않는 한 동일하므로 세션에 한 번만 계산해 둡니다.
+        if "result_cache" not in ss:
+            correct, rows = _grade(questions, ss.answers)
+            ss.result_cache = (correct, _rows_html(rows))
+        correct, table_html = ss.result_cache
 
         name = ss.username.strip()
         st.header(f"{name}님의 결과" if name else "결과")
 
         img_name, msg = result_tier(correct)
-        img_path = os.path.join(base_dir, img_name)
-        if os.path.exists(img_path):
-            st.image(img_path, width=650)  # 결과 이미지도 동일 규칙
+        img = _load_image(base_dir, img_name)
+        if img is not None:
+            st.image(img, width=650)  # 결과 이미지도 동일 규칙
         st.success(f"총 {total}문제 중 {correct}개 정답!  {msg}")
 
         st.markdown("#### 정답/오답 확인")
-        st.table(rows)
+        st.markdown(table_html, unsafe_allow_html=True)
 
         if st.button("처음부터 다시 풀기"):
             ss.page = 0
             ss.answers = {}
+            ss.pop("result_cache", None)
             st.rerun()
 
 # 스크립트가 직접 실행될 때만 main()을 호출합니다.